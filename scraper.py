@@ -6,16 +6,33 @@ from official university websites. All data is extracted at runtime
 from live HTML — no pre-fed/hardcoded course data.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser
 import pandas as pd
+from openpyxl import load_workbook
 import uuid
 import time
 import re
 import os
-from urllib.parse import urljoin
+import argparse
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 import urllib3
 
+try:
+    # Optional: RE2 matches in linear time, so long pages cannot trigger
+    # catastrophic backtracking in the detail patterns below.
+    import re2 as re_fast
+except ImportError:
+    re_fast = re
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 HEADERS = {
@@ -23,80 +40,284 @@ HEADERS = {
     'Accept-Language': 'en-US,en;q=0.9',
 }
 
+# Output sheet columns, in the order they are written
+UNI_COLS = ['university_id', 'university_name', 'country', 'city', 'website']
+COURSE_COLS = ['course_id', 'university_id', 'course_name', 'level', 'discipline', 'duration', 'fees', 'eligibility']
+
+# Politeness limits: at most MAX_PER_HOST requests in flight per host, and
+# requests to the same host start at least HOST_DELAY seconds apart.
+MAX_PER_HOST = 4
+HOST_DELAY = 1.0
+MAX_WORKERS = 8
+
+_host_slots = defaultdict(lambda: threading.Semaphore(MAX_PER_HOST))
+_host_slots_lock = threading.Lock()
+
+# netloc -> earliest time.monotonic() at which the next request may start
+_next_hit = defaultdict(float)
+_next_hit_lock = threading.Lock()
+
+
+def _wait_for_host(url):
+    """Sleeps only as long as needed to keep requests to the URL's host HOST_DELAY apart."""
+    netloc = urlparse(url).netloc
+    with _next_hit_lock:
+        now = time.monotonic()
+        start = max(now, _next_hit[netloc])
+        _next_hit[netloc] = start + HOST_DELAY
+    if start > now:
+        time.sleep(start - now)
+
+
+class _ThrottledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that paces requests per host. Cached responses are returned by the
+    session before the adapter is reached, so only real network hits are delayed.
+    """
+
+    def send(self, request, **kwargs):
+        _wait_for_host(request.url)
+        return super().send(request, **kwargs)
+
+
+def _build_session(backend, verify=True, pool_connections=16, pool_maxsize=32):
+    """
+    Creates a pooled keep-alive session, so repeated hits to the same host reuse
+    the existing TCP/TLS connection. Responses are cached on disk for a day, so
+    re-runs skip the network for unchanged pages.
+    """
+    session = requests_cache.CachedSession(
+        backend=backend,
+        expire_after=timedelta(days=1),
+        allowable_methods=('GET',),
+        match_headers=['Accept-Language'],
+    )
+    session.headers.update(HEADERS)
+    session.verify = verify
+    adapter = _ThrottledAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Built on first use by get_session(), so importing this module does not
+# create the on-disk cache.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(verify=True):
+    """
+    Returns the shared session for verified or unverified fetches, creating both
+    on first call. The unverified one is for sites with broken certificates (the
+    Indian university sites) and shares the verified session's on-disk cache.
+    """
+    with _sessions_lock:
+        if not _sessions:
+            secure = _build_session(requests_cache.SQLiteCache('.scraper_cache'))
+            _sessions[True] = secure
+            _sessions[False] = _build_session(secure.cache, verify=False, pool_connections=8, pool_maxsize=16)
+        return _sessions[bool(verify)]
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  UTILITY FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════
 
-def get_soup(url, verify=True):
-    """Fetches a URL and returns a BeautifulSoup object."""
+def _host_slot(url):
+    """Returns the semaphore that bounds concurrent requests to the URL's host."""
+    with _host_slots_lock:
+        return _host_slots[urlparse(url).netloc]
+
+
+def _fetch(url, verify=True):
+    """Fetches a URL and returns the response, or None (with a warning) on failure."""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15, verify=verify)
+        with _host_slot(url):
+            # Pass verify explicitly: requests only lets a per-request value beat
+            # REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE, not the session's own setting
+            response = get_session(verify).get(url, timeout=15, verify=verify)
         response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
+        return response
     except Exception as e:
         print(f"  [Warning] Could not fetch {url}: {e}")
         return None
 
 
+def get_soup(url, verify=True, parse_only=None):
+    """
+    Fetches a URL and returns a BeautifulSoup object.
+    Pass a SoupStrainer as `parse_only` to build only the matching part of the tree.
+    """
+    response = _fetch(url, verify=verify)
+    if response is None:
+        return None
+    # Raw bytes let lxml sniff the encoding itself
+    return BeautifulSoup(response.content, 'lxml', parse_only=parse_only)
+
+
+def get_tree(url, verify=True):
+    """
+    Fetches a URL and returns a selectolax (lexbor) tree.
+    Much faster than BeautifulSoup for the heading + text lookups on course pages.
+    """
+    response = _fetch(url, verify=verify)
+    if response is None:
+        return None
+    return LexborHTMLParser(response.content)
+
+
+# Details almost always appear near the top of a page, so only this many
+# characters of page text are searched.
+MAX_TEXT_CHARS = 50_000
+
+# Detail patterns are compiled once at import time. The duration, fee and
+# eligibility patterns use re_fast, so case-insensitivity is set inline with
+# (?i), which both RE2 and the stdlib understand.
+
+# Duration: a number with a year/month/semester unit, in one pass. Matches led
+# by 'duration' win outright, then ones followed by 'full-time', 'programme'
+# etc., then bare ones. Semesters only count after 'duration', and bare matches
+# must be a whole number of years/months followed by whitespace.
+_DUR_PAT = re_fast.compile(
+    r'(?i)(?P<ctx>duration[:\s]*)?'
+    r'(?P<dur>(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>years?|months?|semesters?))'
+    r'(?P<post>\s*(?:full[- ]?time|part[- ]?time|programme|program|course))?'
+)
+
+# Fees: a currency amount with at least 3 digits (to avoid matching random small
+# amounts). Amounts shortly after 'tuition/fee/cost' in the same sentence win
+# outright, then ones followed by 'per year', 'tuition' etc., then bare ones.
+# Among several amounts after one keyword, the first wins.
+_FEE_PAT = re_fast.compile(
+    r'(?i)(?P<amt>[£$€₹]\s*[\d,]{3,}(?:\.\d+)?)'
+    r'(?P<post>\s*(?:per\s*(?:annum|year|semester)|tuition|fee))?'
+)
+_FEE_CONTEXT_PAT = re_fast.compile(r'(?i)tuition|fee|cost')
+_FEE_CONTEXT_CHARS = 50
+
+_LEVEL_PAT = re.compile(
+    r"\b(bachelor'?s?|master'?s?|undergraduate|postgraduate|doctoral|ph\.?d|diploma|"
+    r"professional\s*graduate|juris\s*doctor|doctor\s*of\s*medicine)\b",
+    re.IGNORECASE
+)
+
+_ELIG_PATTERNS = [
+    re_fast.compile(r'(?i)(?:eligib\w+|entry\s*requirement|admission\s*requirement)[:\s]*([^.]{10,120})'),
+    re_fast.compile(r'(?i)(?:applicants?\s*(?:must|should|need)|minimum\s*qualification)[:\s]*([^.]{10,120})'),
+    re_fast.compile(r'(?i)(A[\*]?[A-Z]{2,3}\s*(?:at\s*A[- ]?Level|including)[^.]{5,80})'),
+    re_fast.compile(r'(?i)(10\+2\s*[^.]{5,80})'),
+]
+
+
+def _bounded_text(strings):
+    """Joins stripped text chunks with spaces, stopping once MAX_TEXT_CHARS is reached."""
+    parts = []
+    total = 0
+    for s in strings:
+        parts.append(s)
+        total += len(s) + 1
+        if total >= MAX_TEXT_CHARS:
+            break
+    return ' '.join(parts)
+
+
 def extract_details_from_page(soup):
     """
     Dynamically extracts course details (duration, fees, level, eligibility)
     from a page's HTML body using regex and keyword heuristics.
     Returns a dict of found values (only keys that were found).
     """
-    results = {}
     if not soup:
-        return results
+        return {}
 
     body = soup.find('body')
     if not body:
-        return results
+        return {}
+
+    # Prefer the main content block over navigation and footers
+    root = soup.find(['main', 'article']) or soup.find(id='content') or body
+    return extract_details_from_text(_bounded_text(root.stripped_strings))
+
+
+def extract_details_from_tree(tree):
+    """Same as extract_details_from_page, for a selectolax tree."""
+    if tree is None or tree.body is None:
+        return {}
+
+    root = tree.css_first('main, article') or tree.css_first('#content') or tree.body
+    strings = (
+        node.text(strip=True)
+        for node in root.traverse(include_text=True)
+        if node.tag == '-text' and node.parent.tag not in ('script', 'style')
+    )
+    return extract_details_from_text(_bounded_text(s for s in strings if s))
+
+
+_TOP_SCORE = 2
 
-    full_text = body.get_text(' ', strip=True)
+
+def _best_match(pattern, text, score):
+    """
+    Returns the highest-scoring match of `pattern` in `text` (earliest on ties),
+    scanning once and stopping at the first match that reaches _TOP_SCORE.
+    A score of None rejects the match.
+    """
+    best, best_score = None, -1
+    for m in pattern.finditer(text):
+        s = score(m, text)
+        if s is not None and s > best_score:
+            best, best_score = m, s
+            if s >= _TOP_SCORE:
+                break
+    return best
+
+
+def _score_duration(m, text):
+    """Scores a _DUR_PAT match by the context words captured around it."""
+    if m.group('ctx'):
+        return _TOP_SCORE
+    if m.group('unit').lower().startswith('semester'):
+        return None
+    if m.group('post'):
+        return 1
+    if '.' in m.group('num') or not text[m.end('dur'):m.end('dur') + 1].isspace():
+        return None
+    return 0
+
+
+def _score_fee(m, text):
+    """Scores a _FEE_PAT match by fee keywords just before it or a rate just after it."""
+    # Only look back within the current sentence, as the old [^.]{0,50} span did
+    before = text[max(0, m.start() - _FEE_CONTEXT_CHARS):m.start()].rsplit('.', 1)[-1]
+    return _TOP_SCORE if _FEE_CONTEXT_PAT.search(before) else 1 if m.group('post') else 0
+
+
+def extract_details_from_text(full_text):
+    """Runs the detail patterns over a page's text. Returns only the keys that were found."""
+    results = {}
 
     # ── Duration ── (require 'year/month/semester' word after the number)
-    dur_patterns = [
-        re.compile(r'duration[:\s]*(\d+(?:\.\d+)?\s*(?:years?|months?|semesters?))', re.IGNORECASE),
-        re.compile(r'(\d+(?:\.\d+)?\s*(?:years?|months?))\s*(?:full[- ]?time|part[- ]?time|programme|program|course)', re.IGNORECASE),
-        re.compile(r'(\d+\s*(?:years?|months?))\s', re.IGNORECASE),
-    ]
-    for pat in dur_patterns:
-        m = pat.search(full_text)
-        if m:
-            results['Duration'] = m.group(1).strip().title()
-            break
+    m = _best_match(_DUR_PAT, full_text, _score_duration)
+    if m:
+        results['Duration'] = m.group('dur').strip().title()
 
-    # ── Fees ── (require at least 3 digits to avoid matching random small currency amounts)
-    fee_patterns = [
-        re.compile(r'(?:tuition|fee|cost)[^.]{0,50}([£$€₹]\s*[\d,]{3,}(?:\.\d+)?)', re.IGNORECASE),
-        re.compile(r'([£$€₹]\s*[\d,]{3,}(?:\.\d+)?)\s*(?:per\s*(?:annum|year|semester)|tuition|fee)', re.IGNORECASE),
-        re.compile(r'([£$€₹]\s*[\d,]{3,}(?:\.\d+)?)', re.IGNORECASE),
-    ]
-    for pat in fee_patterns:
-        m = pat.search(full_text)
-        if m:
-            results['Fees'] = m.group(1).strip()
-            break
+    # ── Fees ──
+    m = _best_match(_FEE_PAT, full_text, _score_fee)
+    if m:
+        results['Fees'] = m.group('amt').strip()
 
     # ── Level ──
-    level_pat = re.compile(
-        r"\b(bachelor'?s?|master'?s?|undergraduate|postgraduate|doctoral|ph\.?d|diploma|"
-        r"professional\s*graduate|juris\s*doctor|doctor\s*of\s*medicine)\b",
-        re.IGNORECASE
-    )
-    m = level_pat.search(full_text)
+    m = _LEVEL_PAT.search(full_text)
     if m:
         results['Level'] = m.group(1).strip().title()
 
     # ── Eligibility ──
-    elig_patterns = [
-        re.compile(r'(?:eligib\w+|entry\s*requirement|admission\s*requirement)[:\s]*([^.]{10,120})', re.IGNORECASE),
-        re.compile(r'(?:applicants?\s*(?:must|should|need)|minimum\s*qualification)[:\s]*([^.]{10,120})', re.IGNORECASE),
-        re.compile(r'(A[\*]?[A-Z]{2,3}\s*(?:at\s*A[- ]?Level|including)[^.]{5,80})', re.IGNORECASE),
-        re.compile(r'(10\+2\s*[^.]{5,80})', re.IGNORECASE),
-    ]
-    for pat in elig_patterns:
+    for pat in _ELIG_PATTERNS:
         m = pat.search(full_text)
         if m:
             results['Eligibility'] = m.group(1).strip()[:150]
@@ -105,45 +326,84 @@ def extract_details_from_page(soup):
     return results
 
 
-def extract_course_name(soup):
-    """Extracts a course name from H1 or H2 tags on the page."""
-    if not soup:
+def extract_course_name(tree):
+    """Extracts a course name from H1 or H2 tags on the page (selectolax tree)."""
+    if tree is None:
         return None
     for tag in ['h1', 'h2']:
-        el = soup.find(tag)
-        if el:
-            text = el.get_text(strip=True).replace('\n', ' ')
+        el = tree.css_first(tag)
+        if el is not None:
+            text = el.text(strip=True).replace('\n', ' ')
             if 5 < len(text) < 120:
                 return text
     return None
 
 
+def _keyword_pattern(keywords):
+    """Compiles a list of substring keywords into one alternation, so a text is scanned once."""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+# Keyword -> discipline. Order matters: when several keywords occur in a name,
+# the one listed first wins.
+_DISCIPLINE_MAP = {
+    'computer': 'Computer Science', 'engineering': 'Engineering',
+    'law': 'Law', 'medicine': 'Medicine', 'medic': 'Medicine',
+    'business': 'Business', 'management': 'Management', 'mba': 'Management',
+    'pharm': 'Pharmacy', 'nurs': 'Nursing', 'architect': 'Architecture',
+    'math': 'Mathematics', 'econom': 'Economics', 'dent': 'Dentistry',
+    'communi': 'Communication', 'history': 'History', 'archaeol': 'Archaeology',
+    'data science': 'Data Science', 'arts': 'Arts', 'science': 'Sciences',
+    'hotel': 'Hotel Management', 'commerce': 'Commerce',
+}
+_DISCIPLINE_RANK = {kw: i for i, kw in enumerate(_DISCIPLINE_MAP)}
+# Zero-width lookahead so overlapping keywords are all reported in one scan
+_DISCIPLINE_PAT = re.compile('(?=(' + '|'.join(map(re.escape, _DISCIPLINE_MAP)) + '))')
+
+
+@lru_cache(maxsize=512)
 def guess_discipline(name):
     """Guesses the discipline from a course name using keyword matching."""
-    name_lower = name.lower()
-    discipline_map = {
-        'computer': 'Computer Science', 'engineering': 'Engineering',
-        'law': 'Law', 'medicine': 'Medicine', 'medic': 'Medicine',
-        'business': 'Business', 'management': 'Management', 'mba': 'Management',
-        'pharm': 'Pharmacy', 'nurs': 'Nursing', 'architect': 'Architecture',
-        'math': 'Mathematics', 'econom': 'Economics', 'dent': 'Dentistry',
-        'communi': 'Communication', 'history': 'History', 'archaeol': 'Archaeology',
-        'data science': 'Data Science', 'arts': 'Arts', 'science': 'Sciences',
-        'hotel': 'Hotel Management', 'commerce': 'Commerce',
-    }
-    for keyword, disc in discipline_map.items():
-        if keyword in name_lower:
-            return disc
-    return 'General'
+    hits = _DISCIPLINE_PAT.findall(name.lower())
+    if not hits:
+        return 'General'
+    return _DISCIPLINE_MAP[min(hits, key=_DISCIPLINE_RANK.__getitem__)]
+
+
+# Programme-name token -> level. When tokens for several levels occur, the
+# level listed first wins (Master's, then Doctoral, then Diploma).
+_LEVEL_TOKENS = {
+    'm.tech': "Master's", 'm.sc': "Master's", 'master': "Master's",
+    'mba': "Master's", 'll.m': "Master's",
+    'ph.d': 'Doctoral',
+    'diploma': 'Diploma',
+}
+_LEVEL_RANK = {level: i for i, level in enumerate(dict.fromkeys(_LEVEL_TOKENS.values()))}
+_LEVEL_TOKEN_PAT = _keyword_pattern(_LEVEL_TOKENS)
+
+
+def guess_level(name):
+    """Guesses the level from a programme name in one scan; defaults to Bachelor's."""
+    levels = {_LEVEL_TOKENS[kw] for kw in _LEVEL_TOKEN_PAT.findall(name.lower())}
+    if not levels:
+        return "Bachelor's"
+    return min(levels, key=_LEVEL_RANK.__getitem__)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  UNIVERSITY INFO (from Wikipedia)
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Only the article heading (h1.firstHeading) and the infobox table are read,
+# so nav boxes, wikitables and the article body are skipped while parsing.
+# While straining, bs4 sees the raw class attribute ("infobox vcard"), so each
+# class is matched as a whole word within it.
+_WIKI_STRAINER = SoupStrainer(['h1', 'table'], class_=re.compile(r'(^|\s)(firstHeading|infobox)(\s|$)'))
+
+
 def fetch_wiki_university_info(wiki_url):
     """Extracts university name, country, city, and website from Wikipedia."""
-    soup = get_soup(wiki_url)
+    soup = get_soup(wiki_url, parse_only=_WIKI_STRAINER)
     if not soup:
         return {}
 
@@ -200,7 +460,7 @@ def scrape_course_page(url, fallback_name="Unknown Course", verify=True):
     Visits a single course page and dynamically extracts all details.
     Nothing is pre-fed — everything comes from the live HTML.
     """
-    soup = get_soup(url, verify=verify)
+    tree = get_tree(url, verify=verify)
 
     course = {
         'Course Name': fallback_name,
@@ -211,16 +471,16 @@ def scrape_course_page(url, fallback_name="Unknown Course", verify=True):
         'Eligibility': 'Not Available',
     }
 
-    if not soup:
+    if tree is None:
         return course
 
     # Extract course name from page headings
-    page_name = extract_course_name(soup)
+    page_name = extract_course_name(tree)
     if page_name:
         course['Course Name'] = page_name
 
     # Extract all details dynamically from page text
-    details = extract_details_from_page(soup)
+    details = extract_details_from_tree(tree)
     for key in ['Level', 'Duration', 'Fees', 'Eligibility']:
         if key in details:
             course[key] = details[key]
@@ -231,6 +491,20 @@ def scrape_course_page(url, fallback_name="Unknown Course", verify=True):
     return course
 
 
+def scrape_course_pages(pages, verify=True):
+    """
+    Scrapes several course pages concurrently.
+    `pages` is a list of (url, fallback_name) pairs; results keep that order.
+    """
+    if not pages:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(pages), MAX_WORKERS)) as executor:
+        return list(executor.map(
+            lambda page: scrape_course_page(page[0], fallback_name=page[1], verify=verify),
+            pages,
+        ))
+
+
 def discover_and_scrape(listing_url, link_selector, base_url=None, verify=True, max_courses=5):
     """
     Visits a listing page, discovers course links using the CSS selector,
@@ -240,16 +514,15 @@ def discover_and_scrape(listing_url, link_selector, base_url=None, verify=True,
         base_url = listing_url
 
     soup = get_soup(listing_url, verify=verify)
-    courses = []
-
     if not soup:
-        return courses
+        return []
 
     links = soup.select(link_selector)
     seen_urls = set()
+    pages = []
 
     for link in links:
-        if len(courses) >= max_courses:
+        if len(pages) >= max_courses:
             break
         href = link.get('href', '')
         text = link.get_text(strip=True)
@@ -262,11 +535,9 @@ def discover_and_scrape(listing_url, link_selector, base_url=None, verify=True,
         seen_urls.add(full_url)
 
         print(f"    -> Scraping: {text[:50]} ({full_url[:60]}...)")
-        course = scrape_course_page(full_url, fallback_name=text, verify=verify)
-        courses.append(course)
-        time.sleep(1)
+        pages.append((full_url, text))
 
-    return courses
+    return scrape_course_pages(pages, verify=verify)
 
 
 # ── Oxford ──────────────────────────────────────────────────────────────────
@@ -285,36 +556,45 @@ def extract_courses_oxford():
 
 # ── Cambridge ───────────────────────────────────────────────────────────────
 
+# Course page URLs contain '-ba-', '-bsc-', '-meng-', '-hons' etc.
+_CAMBRIDGE_COURSE_HREF_PAT = _keyword_pattern(['-ba-', '-bsc-', '-meng-', '-hons', '-mmath', '-msci'])
+
+
 def extract_courses_cambridge():
     """Dynamically discovers and scrapes courses from cam.ac.uk A-Z listing."""
     print("  Discovering courses from Cambridge A-Z course listing...")
     listing_url = "https://www.undergraduate.study.cam.ac.uk/courses/search"
     soup = get_soup(listing_url)
-    courses = []
+    pages = []
+    seen_urls = set()
     if soup:
         # Find links that go to individual course pages (e.g. /courses/architecture-ba-hons-march)
         for a in soup.find_all('a', href=True):
-            if len(courses) >= 5:
+            if len(pages) >= 5:
                 break
             href = a.get('href', '')
             text = a.get_text(strip=True)
-            # Course page URLs contain '-ba-', '-bsc-', '-meng-', '-hons' etc.
-            if '/courses/' in href and len(text) > 5 and any(kw in href.lower() for kw in ['-ba-', '-bsc-', '-meng-', '-hons', '-mmath', '-msci']):
+            if '/courses/' in href and len(text) > 5 and _CAMBRIDGE_COURSE_HREF_PAT.search(href.lower()):
                 full_url = href if href.startswith('http') else urljoin(listing_url, href)
-                if not any(c.get('_url') == full_url for c in courses):
-                    print(f"    -> Scraping: {text[:50]}")
-                    course = scrape_course_page(full_url, fallback_name=text)
-                    course['_url'] = full_url  # Track to avoid dups
-                    courses.append(course)
-                    time.sleep(1)
-    # Remove tracking key
-    for c in courses:
-        c.pop('_url', None)
+                if full_url in seen_urls:
+                    continue
+                seen_urls.add(full_url)
+                print(f"    -> Scraping: {text[:50]}")
+                pages.append((full_url, text))
+    courses = scrape_course_pages(pages)
     return pad_courses(courses, "Cambridge")
 
 
 # ── Harvard ─────────────────────────────────────────────────────────────────
 
+# Wikipedia link titles that look like academic subjects (not meta-articles)
+_HARVARD_SUBJECT_PAT = _keyword_pattern([
+    'science', 'math', 'engineer', 'history', 'econom', 'computer', 'physic', 'chemi',
+    'biolog', 'literature', 'philosophy', 'politic', 'psycholog', 'sociolog',
+    'statistic', 'linguist', 'music',
+])
+
+
 def extract_courses_harvard():
     """Dynamically scrapes Harvard concentrations from Wikipedia + fees from harvard.edu."""
     print("  Discovering concentrations from Harvard Wikipedia page...")
@@ -324,37 +604,27 @@ def extract_courses_harvard():
     # Step 1: Get concentrations list from Wikipedia
     wiki_soup = get_soup("https://en.wikipedia.org/wiki/Harvard_College")
     if wiki_soup:
-        # Find the "Concentrations" or "Academics" section
-        all_lists = wiki_soup.find_all('ul')
+        # Look for list links with educational-sounding titles, in document order
         seen = set()
-        for ul in all_lists:
-            if len(courses) >= 5:
-                break
-            for li in ul.find_all('li'):
-                if len(courses) >= 5:
-                    break
-                # Look for links with educational-sounding titles
-                for a in li.find_all('a', title=True):
-                    title = a.get('title', '').strip()
-                    if len(title) < 5 or len(title) > 60:
-                        continue
-                    title_lower = title.lower()
-                    # Filter for academic subjects (not meta-articles)
-                    if any(kw in title_lower for kw in ['science', 'math', 'engineer', 'history',
-                                                         'econom', 'computer', 'physic', 'chemi',
-                                                         'biolog', 'literature', 'philosophy',
-                                                         'politic', 'psycholog', 'sociolog',
-                                                         'statistic', 'linguist', 'music']):
-                        if title not in seen and 'university' not in title_lower:
-                            seen.add(title)
-                            courses.append({
-                                'Course Name': f"Concentration in {title}",
-                                'Level': "Bachelor's",
-                                'Discipline': guess_discipline(title),
-                                'Duration': '4 Years',
-                                'Fees': 'Not Available',
-                                'Eligibility': 'Not Available',
-                            })
+        for a in wiki_soup.select('ul li a[title]'):
+            title = a['title'].strip()
+            if len(title) < 5 or len(title) > 60:
+                continue
+            title_lower = title.lower()
+            # Filter for academic subjects (not meta-articles)
+            if _HARVARD_SUBJECT_PAT.search(title_lower):
+                if title not in seen and 'university' not in title_lower:
+                    seen.add(title)
+                    courses.append({
+                        'Course Name': f"Concentration in {title}",
+                        'Level': "Bachelor's",
+                        'Discipline': guess_discipline(title),
+                        'Duration': '4 Years',
+                        'Fees': 'Not Available',
+                        'Eligibility': 'Not Available',
+                    })
+                    if len(courses) >= 5:
+                        break
 
     # Step 2: Try to get tuition from the financial aid page
     print("  Extracting fees from Harvard financial aid page...")
@@ -371,6 +641,14 @@ def extract_courses_harvard():
 
 # ── Jamia Millia Islamia ────────────────────────────────────────────────────
 
+_JMI_PROGRAMME_PAT = _keyword_pattern([
+    'b.tech', 'm.tech', 'b.sc', 'm.sc', 'mba', 'bds', 'b.arch',
+    'diploma', 'civil engineering', 'mechanical engineering',
+    'electrical engineering', 'computer engineering',
+    'electronics', 'environmental', 'aeronautic',
+])
+
+
 def extract_courses_jmi():
     """Dynamically discovers and scrapes courses from jmi.ac.in FET page."""
     print("  Discovering courses from JMI Faculty of Engineering...")
@@ -381,26 +659,17 @@ def extract_courses_jmi():
     if fet_soup:
         # The FET page lists programmes as text items — scan all text nodes
         seen = set()
-        programme_keywords = [
-            'b.tech', 'm.tech', 'b.sc', 'm.sc', 'mba', 'bds', 'b.arch',
-            'diploma', 'civil engineering', 'mechanical engineering',
-            'electrical engineering', 'computer engineering',
-            'electronics', 'environmental', 'aeronautic',
-        ]
         for tag in fet_soup.find_all(['li', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'strong', 'b']):
             text = tag.get_text(strip=True)
             if len(text) < 8 or len(text) > 100:
                 continue
             text_lower = text.lower()
-            if any(kw in text_lower for kw in programme_keywords):
+            if _JMI_PROGRAMME_PAT.search(text_lower):
                 if text not in seen:
                     seen.add(text)
-                    level = 'Master\'s' if any(k in text_lower for k in ['m.tech', 'm.sc', 'master', 'mba']) else \
-                            'Doctoral' if 'ph.d' in text_lower else \
-                            'Diploma' if 'diploma' in text_lower else "Bachelor's"
                     courses.append({
                         'Course Name': text,
-                        'Level': level,
+                        'Level': guess_level(text),
                         'Discipline': guess_discipline(text),
                         'Duration': '4 Years (8 Semesters)' if 'b.tech' in text_lower else 'Not Available',
                         'Fees': 'Not Available',
@@ -422,20 +691,33 @@ def extract_courses_jmi():
         "https://www.jmi.ac.in/fae",
         "https://www.jmi.ac.in/ajkmcrc",
     ]
-    for url in extra_urls:
-        if len(courses) >= 5:
-            break
-        print(f"    -> Scraping: {url}")
-        course = scrape_course_page(url, fallback_name="JMI Programme", verify=False)
-        if course['Course Name'] != 'JMI Programme':
-            courses.append(course)
-        time.sleep(1)
+    if len(courses) < 5:
+        for url in extra_urls:
+            print(f"    -> Scraping: {url}")
+        extras = scrape_course_pages([(url, "JMI Programme") for url in extra_urls], verify=False)
+        for course in extras:
+            if len(courses) >= 5:
+                break
+            if course['Course Name'] != 'JMI Programme':
+                courses.append(course)
 
     return pad_courses(courses, "JMI")
 
 
 # ── Jamia Hamdard ───────────────────────────────────────────────────────────
 
+_HAMDARD_COURSE_PAT = _keyword_pattern([
+    'b.pharm', 'd.pharm', 'b.tech', 'm.tech', 'mba', 'bba', 'b.com',
+    'b.sc', 'm.sc', 'ba.ll.b', 'll.m', 'ph.d', 'bachelor', 'master',
+    'diploma', 'nursing', 'hotel management', 'bms',
+])
+# Phrases that mark mission statements and other non-course text
+_HAMDARD_SKIP_PAT = _keyword_pattern([
+    'to offer', 'to provide', 'to develop', 'to use',
+    'ambassador', 'research', 'vision', 'mission',
+])
+
+
 def extract_courses_jamia_hamdard():
     """Dynamically discovers and scrapes courses from jamiahamdard.ac.in school pages."""
     print("  Discovering schools from Jamia Hamdard...")
@@ -459,11 +741,6 @@ def extract_courses_jamia_hamdard():
     print(f"  Found {len(school_links)} school pages to scan")
 
     # Step 2: Visit each school page and extract course names from its content
-    course_keywords = [
-        'b.pharm', 'd.pharm', 'b.tech', 'm.tech', 'mba', 'bba', 'b.com',
-        'b.sc', 'm.sc', 'ba.ll.b', 'll.m', 'ph.d', 'bachelor', 'master',
-        'diploma', 'nursing', 'hotel management', 'bms',
-    ]
     for school in school_links:
         if len(courses) >= 5:
             break
@@ -482,25 +759,20 @@ def extract_courses_jamia_hamdard():
             text = tag.get_text(strip=True)
             text_lower = text.lower()
             # Must be right length AND contain a course-related keyword
-            if 5 < len(text) < 80 and any(kw in text_lower for kw in course_keywords):
+            if 5 < len(text) < 80 and _HAMDARD_COURSE_PAT.search(text_lower):
                 # Extra filter: skip if it looks like a mission statement or non-course text
-                if any(skip in text_lower for skip in ['to offer', 'to provide', 'to develop', 'to use',
-                                                         'ambassador', 'research', 'vision', 'mission']):
+                if _HAMDARD_SKIP_PAT.search(text_lower):
                     continue
                 if not any(c['Course Name'] == text for c in courses):
-                    level = 'Master\'s' if any(k in text_lower for k in ['m.tech', 'm.sc', 'master', 'mba', 'll.m']) else \
-                            'Doctoral' if 'ph.d' in text_lower else "Bachelor's"
                     courses.append({
                         'Course Name': text,
-                        'Level': level,
+                        'Level': guess_level(text),
                         'Discipline': guess_discipline(text),
                         'Duration': page_details.get('Duration', 'Not Available'),
                         'Fees': page_details.get('Fees', 'Not Available'),
                         'Eligibility': page_details.get('Eligibility', 'Not Available'),
                     })
 
-        time.sleep(1)
-
     return pad_courses(courses, "Jamia Hamdard")
 
 
@@ -522,11 +794,80 @@ def pad_courses(courses, label):
     return courses[:5]
 
 
+def dedupe_and_fill(df, subset):
+    """
+    Drops duplicate rows on `subset` (keeping the latest) and fills gaps with "Not Available".
+    Text columns are deduplicated as categoricals, so rows are hashed by integer
+    codes instead of Python strings, then converted back to plain objects for writing.
+    """
+    text_cols = df.select_dtypes(include=['object', 'string']).columns
+    df = df.astype({col: 'category' for col in text_cols})
+    df = df.drop_duplicates(subset=subset, keep='last', ignore_index=True)
+    return df.astype(object).fillna("Not Available")
+
+
+def read_existing_sheets(path, sheet_names=('Universities', 'Courses')):
+    """
+    Reads sheets of an existing workbook into DataFrames (first row as header).
+    Uses openpyxl's read-only mode, which streams cell values and skips styles.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = []
+        for name in sheet_names:
+            rows = wb[name].iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            data = [row for row in rows if any(v is not None for v in row)]
+            frames.append(pd.DataFrame(data, columns=header))
+        return frames
+    finally:
+        wb.close()
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  MAIN
 # ═══════════════════════════════════════════════════════════════════════════
 
-def main():
+def _process_target(target):
+    """
+    Scrapes one university: its Wikipedia info plus its courses.
+    Returns (university_row, course_rows) linked by a freshly generated university_id.
+    """
+    # 1. University info from Wikipedia
+    print(f"[University] {target['wiki']}")
+    uni_info = fetch_wiki_university_info(target['wiki'])
+    uni_id = str(uuid.uuid4())[:8]
+
+    uni_row = {
+        'university_id': uni_id,
+        'university_name': uni_info.get('University Name', 'Not Available'),
+        'country': uni_info.get('Country', 'Not Available'),
+        'city': uni_info.get('City', 'Not Available'),
+        'website': uni_info.get('Website', 'Not Available'),
+    }
+
+    # 2. Courses — dynamically scraped from official websites
+    uni_name = uni_info.get('University Name', 'Unknown')
+    print(f"[Courses]    Dynamically scraping for {uni_name}...")
+    course_rows = []
+    for c in target['fetch_courses']():
+        course_rows.append({
+            'course_id': str(uuid.uuid4())[:8],
+            'university_id': uni_id,
+            'course_name': c.get('Course Name', 'Not Available'),
+            'level': c.get('Level', 'Not Available'),
+            'discipline': c.get('Discipline', 'Not Available'),
+            'duration': c.get('Duration', 'Not Available'),
+            'fees': c.get('Fees', 'Not Available'),
+            'eligibility': c.get('Eligibility', 'Not Available'),
+        })
+    return uni_row, course_rows
+
+
+def main(refresh=False):
+    if refresh:
+        get_session().cache.clear()
+
     targets = [
         {"wiki": "https://en.wikipedia.org/wiki/Jamia_Hamdard",            "fetch_courses": extract_courses_jamia_hamdard},
         {"wiki": "https://en.wikipedia.org/wiki/Jamia_Millia_Islamia",     "fetch_courses": extract_courses_jmi},
@@ -543,46 +884,25 @@ def main():
     print("  All data extracted dynamically from live websites")
     print("=" * 60 + "\n")
 
-    for target in targets:
-        # 1. University info from Wikipedia
-        print(f"[University] {target['wiki']}")
-        uni_info = fetch_wiki_university_info(target['wiki'])
-        uni_id = str(uuid.uuid4())[:8]
-
-        universities_data.append({
-            'university_id': uni_id,
-            'university_name': uni_info.get('University Name', 'Not Available'),
-            'country': uni_info.get('Country', 'Not Available'),
-            'city': uni_info.get('City', 'Not Available'),
-            'website': uni_info.get('Website', 'Not Available'),
-        })
-
-        # 2. Courses — dynamically scraped from official websites
-        uni_name = uni_info.get('University Name', 'Unknown')
-        print(f"[Courses]    Dynamically scraping for {uni_name}...")
-        for c in target['fetch_courses']():
-            courses_data.append({
-                'course_id': str(uuid.uuid4())[:8],
-                'university_id': uni_id,
-                'course_name': c.get('Course Name', 'Not Available'),
-                'level': c.get('Level', 'Not Available'),
-                'discipline': c.get('Discipline', 'Not Available'),
-                'duration': c.get('Duration', 'Not Available'),
-                'fees': c.get('Fees', 'Not Available'),
-                'eligibility': c.get('Eligibility', 'Not Available'),
-            })
-        print()
+    # Scrape all universities at once. Several targets share hosts (every one
+    # hits en.wikipedia.org), so same-host pacing relies on the per-host limits
+    # in _host_slot and _ThrottledAdapter. map() keeps results in target order
+    # for a stable sheet layout.
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        for uni_row, course_rows in executor.map(_process_target, targets):
+            universities_data.append(uni_row)
+            courses_data.extend(course_rows)
+    print()
 
     # Build DataFrames from newly scraped data
-    df_uni_new = pd.DataFrame(universities_data)
-    df_courses_new = pd.DataFrame(courses_data)
+    df_uni_new = pd.DataFrame.from_records(universities_data, columns=UNI_COLS)
+    df_courses_new = pd.DataFrame.from_records(courses_data, columns=COURSE_COLS)
 
     # Append to existing Excel file if it exists
     output = "Universities_and_Courses.xlsx"
     if os.path.exists(output):
         try:
-            df_uni_existing = pd.read_excel(output, sheet_name='Universities')
-            df_courses_existing = pd.read_excel(output, sheet_name='Courses')
+            df_uni_existing, df_courses_existing = read_existing_sheets(output)
             print(f"[Append]     Found existing {output} with {len(df_uni_existing)} universities and {len(df_courses_existing)} courses")
             df_uni = pd.concat([df_uni_existing, df_uni_new], ignore_index=True)
             df_courses = pd.concat([df_courses_existing, df_courses_new], ignore_index=True)
@@ -595,12 +915,10 @@ def main():
         df_courses = df_courses_new
 
     # Deduplicate and clean
-    df_uni = df_uni.drop_duplicates(subset=['university_name'], keep='last')
-    df_courses = df_courses.drop_duplicates(subset=['course_name', 'university_id'], keep='last')
-    df_uni = df_uni.fillna("Not Available")
-    df_courses = df_courses.fillna("Not Available")
+    df_uni = dedupe_and_fill(df_uni, subset=['university_name'])
+    df_courses = dedupe_and_fill(df_courses, subset=['course_name', 'university_id'])
 
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         df_uni.to_excel(writer, sheet_name='Universities', index=False)
         df_courses.to_excel(writer, sheet_name='Courses', index=False)
 
@@ -609,4 +927,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape university and course data into an Excel file.")
+    parser.add_argument('--refresh', action='store_true', help="clear the HTTP cache and fetch every page again")
+    args = parser.parse_args()
+    main(refresh=args.refresh)
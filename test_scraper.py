@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import scraper
+
+WIKI_PAGE = b"""
+<html><body>
+<h1 id="firstHeading" class="firstHeading mw-first-heading"><span>Jamia Hamdard</span></h1>
+<table class="infobox vcard">
+  <tr><th>Location</th><td>New Delhi, Delhi, India</td></tr>
+  <tr><th>Website</th><td><a href="https://jamiahamdard.ac.in">jamiahamdard.ac.in</a></td></tr>
+</table>
+<table class="navbox">
+  <tr><th>Website</th><td><a href="https://example.org">example.org</a></td></tr>
+</table>
+</body></html>
+"""
+
+
+def test_fetch_wiki_university_info_reads_heading_and_infobox(monkeypatch):
+    monkeypatch.setattr(scraper, '_fetch', lambda url, verify=True: SimpleNamespace(content=WIKI_PAGE))
+
+    info = scraper.fetch_wiki_university_info("https://en.wikipedia.org/wiki/Jamia_Hamdard")
+
+    assert info == {
+        'University Name': 'Jamia Hamdard',
+        'Country': 'India',
+        'City': 'New Delhi',
+        'Website': 'https://jamiahamdard.ac.in',
+    }
+
+
+@pytest.mark.parametrize('verify', [False, True])
+def test_fetch_verify_choice_wins_over_ca_bundle_env(monkeypatch, tmp_path, verify):
+    bundle = '/etc/ssl/certs/ca-certificates.crt'
+    monkeypatch.setenv('REQUESTS_CA_BUNDLE', bundle)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, '_sessions', {})
+
+    sent = {}
+
+    def fake_send(request, **kwargs):
+        sent.update(kwargs)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'<html></html>'
+        return response
+
+    monkeypatch.setattr(scraper.get_session(verify), 'send', fake_send)
+
+    assert scraper._fetch("https://www.jmi.ac.in/fet", verify=verify) is not None
+    # An unverified fetch must stay unverified; a verified one may use the bundle
+    assert sent['verify'] == (bundle if verify else False)
+
+
+def test_duration_led_match_beats_earlier_bare_one():
+    text = "Students spend 4 years here in total. Duration: 3 years"
+    assert scraper.extract_details_from_text(text)['Duration'] == '3 Years'
+
+
+def test_duration_followed_by_mode_beats_earlier_bare_one():
+    text = "Over 10 years of history. The degree is 3 years full-time"
+    assert scraper.extract_details_from_text(text)['Duration'] == '3 Years'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Duration: 6 semesters", '6 Semesters'),
+    ("3 semesters of study", None),
+    ("It takes 2.5 years. Apply now", None),
+    ("It takes 3 years here", '3 Years'),
+])
+def test_duration_only_counts_semesters_and_decimals_in_context(text, expected):
+    assert scraper.extract_details_from_text(text).get('Duration') == expected
+
+
+def test_fee_keyword_only_counts_within_the_same_sentence():
+    text = "Read about tuition. Library deposit £500 in cash. Annual fee £9,250 for all"
+    assert scraper.extract_details_from_text(text)['Fees'] == '£9,250'
+
+
+def test_first_amount_after_fee_keyword_wins():
+    text = "Fees: see table £12,000 and £3,000 tuition"
+    assert scraper.extract_details_from_text(text)['Fees'] == '£12,000'
+
+
+def test_best_match_stops_at_first_top_score():
+    scores = {'a': 0, 'b': scraper._TOP_SCORE, 'c': scraper._TOP_SCORE + 1}
+    scored = []
+
+    def score(m, text):
+        scored.append(m.group())
+        return scores[m.group()]
+
+    m = scraper._best_match(scraper.re.compile('[abc]'), "abc", score)
+
+    assert m.group() == 'b'
+    assert scored == ['a', 'b']
+
+
+@pytest.mark.parametrize('name, expected', [
+    ("Ph.D and M.Tech", "Master's"),
+    ("PG Diploma & Ph.D", 'Doctoral'),
+    ("Ph.D in Chemistry", 'Doctoral'),
+    ("Diploma in Pharmacy", 'Diploma'),
+    ("LL.M (Master of Laws)", "Master's"),
+    ("MBA", "Master's"),
+    ("B.Tech Civil Engineering", "Bachelor's"),
+])
+def test_guess_level(name, expected):
+    assert scraper.guess_level(name) == expected
+
+
+def _guess_discipline_by_dict_order(name):
+    # The original loop: the first _DISCIPLINE_MAP keyword found in the name wins
+    for keyword, disc in scraper._DISCIPLINE_MAP.items():
+        if keyword in name.lower():
+            return disc
+    return 'General'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ("B.Tech Computer Engineering", 'Computer Science'),
+    ("Data Science and Engineering", 'Engineering'),
+    ("MBA in Hotel Management", 'Management'),
+    ("Bachelor of Dental Surgery", 'Dentistry'),
+    ("B.Pharm", 'Pharmacy'),
+    ("Concentration in Applied Mathematics", 'Mathematics'),
+    ("Zoology", 'General'),
+])
+def test_guess_discipline(name, expected):
+    assert scraper.guess_discipline(name) == expected
+    assert _guess_discipline_by_dict_order(name) == expected